@@ -7,10 +7,15 @@ from aqt.qt import (
     QComboBox,
     QDialog,
     QDialogButtonBox,
+    QFormLayout,
     QLabel,
     QLineEdit,
+    QPlainTextEdit,
+    QScrollArea,
     QVBoxLayout,
+    QWidget,
 )
+from aqt.operations import CollectionOp
 from aqt.utils import showInfo
 
 addon_dir = os.path.dirname(__file__)
@@ -18,13 +23,44 @@ vendor_dir = os.path.join(addon_dir, "vendor")
 if vendor_dir not in sys.path:
     sys.path.insert(0, vendor_dir)
 
-from .convert import translate
+from . import fetch
+from .compact import CompactBatch
+from .convert import translate, translate_batch
+from .resolve import Resolver
+from .schema import SchemaCache
 
 
+resolver_cache_path = os.path.join(addon_dir, "user_files", "resolve_cache.json")
+
+# Simultaneous requests to pealim.com made by the add-on
+request_concurrency = 8
+
 action = QAction("Create Note from Pealim", mw)
+word_list_action = QAction("Create Notes from Pealim Word List", mw)
+
+
+def add_buttons(dialog, layout):
+    buttons = QDialogButtonBox(
+        QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+        parent=dialog,
+    )
+    buttons.accepted.connect(dialog.accept)
+    buttons.rejected.connect(dialog.reject)
+    layout.addWidget(buttons)
 
 
-class CreateNoteDialog(QDialog):
+class DeckDialog(QDialog):
+    def set_decks(self, decks, current_deck_id):
+        self.deck_combo.clear()
+        current_index = 0
+        for idx, (name, deck_id) in enumerate(decks):
+            self.deck_combo.addItem(name, deck_id)
+            if deck_id == current_deck_id:
+                current_index = idx
+        self.deck_combo.setCurrentIndex(current_index)
+
+
+class CreateNoteDialog(DeckDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Create Note")
@@ -40,26 +76,63 @@ class CreateNoteDialog(QDialog):
         layout.addWidget(QLabel("Deck:", self))
         layout.addWidget(self.deck_combo)
 
-        buttons = QDialogButtonBox(
-            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
-            parent=self,
-        )
-        buttons.accepted.connect(self.accept)
-        buttons.rejected.connect(self.reject)
-        layout.addWidget(buttons)
+        add_buttons(self, layout)
 
-    def set_decks(self, decks, current_deck_id):
-        self.deck_combo.clear()
-        current_index = 0
-        for idx, (name, deck_id) in enumerate(decks):
-            self.deck_combo.addItem(name, deck_id)
-            if deck_id == current_deck_id:
-                current_index = idx
-        self.deck_combo.setCurrentIndex(current_index)
 
+class WordListDialog(DeckDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Create Notes from Word List")
 
-def prompt_and_create_note():
-    dialog = CreateNoteDialog(mw)
+        self.words_input = QPlainTextEdit(self)
+        self.words_input.setPlaceholderText("One Hebrew or English word per line")
+
+        self.deck_combo = QComboBox(self)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Words:", self))
+        layout.addWidget(self.words_input)
+        layout.addWidget(QLabel("Deck:", self))
+        layout.addWidget(self.deck_combo)
+
+        add_buttons(self, layout)
+
+
+class ReviewDialog(QDialog):
+    def __init__(self, ambiguous, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Review Ambiguous Words")
+
+        form_widget = QWidget(self)
+        form = QFormLayout(form_widget)
+        self.combos = {}
+        for word, candidates in ambiguous.items():
+            combo = QComboBox(form_widget)
+            combo.addItem("(skip)", None)
+            for candidate in candidates:
+                combo.addItem(candidate.label, candidate)
+            form.addRow(word, combo)
+            self.combos[word] = combo
+
+        scroll = QScrollArea(self)
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(form_widget)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Choose the entry for each word:", self))
+        layout.addWidget(scroll)
+
+        add_buttons(self, layout)
+
+    def choices(self):
+        return {
+            word: combo.currentData()
+            for word, combo in self.combos.items()
+            if combo.currentData() is not None
+        }
+
+
+def init_deck_dialog(dialog):
     decks = sorted(
         [(deck.name, deck.id) for deck in mw.col.decks.all_names_and_ids()],
         key=lambda d: d[0].lower(),
@@ -67,6 +140,32 @@ def prompt_and_create_note():
     current_deck_id = mw.col.decks.current()["id"]
     dialog.set_decks(decks, current_deck_id)
 
+
+def add_results(results, deck_id, schemas):
+    missing_note_types, mismatched = schemas.check(results)
+    created = 0
+    for note_type_name, card in results.items():
+        if card is not None:
+            created += schemas.add_note(note_type_name, card, deck_id)
+
+    return created, missing_note_types, mismatched
+
+
+def format_problems(missing_note_types, mismatched):
+    problems = []
+    if missing_note_types:
+        problems.append(f"Missing note types: {', '.join(sorted(missing_note_types))}")
+    for note_type_name, missing_fields in sorted(mismatched.items()):
+        problems.append(
+            f"Note type {note_type_name} is missing fields: {', '.join(missing_fields)}"
+        )
+    return problems
+
+
+def prompt_and_create_note():
+    dialog = CreateNoteDialog(mw)
+    init_deck_dialog(dialog)
+
     if dialog.exec() != QDialog.DialogCode.Accepted:
         return
     url = dialog.url_input.text().strip()
@@ -85,38 +184,136 @@ def prompt_and_create_note():
         showInfo("No results returned.")
         return
 
-    missing_note_types = []
-    for note_type_name, fields_and_tags in results.items():
+    _, missing_note_types, mismatched = add_results(
+        results, deck_id, SchemaCache(mw.col)
+    )
+    problems = format_problems(missing_note_types, mismatched)
+
+    if problems:
+        showInfo("\n".join(problems))
+    mw.reset()
 
-        # print(f"{note_type_name}: {fields_and_tags}")
 
-        note_type = mw.col.models.by_name(note_type_name)
-        if note_type is None:
-            missing_note_types.append(note_type_name)
-            continue
+def translate_urls(urls):
+    if fetch.httpx is not None:
+        batch = fetch.translate_many(urls, request_concurrency)
+    else:
+        batch = translate_batch(urls, request_concurrency)
+
+    results, failed = CompactBatch(), {}
+    for result in batch:
+        if result.error is None:
+            results.append(result.results)
+        else:
+            failed[result.url] = str(result.error)
+    return results, failed
+
+
+def create_notes_from_urls(urls, deck_id, problems):
+    def on_done(future):
+        try:
+            all_results, failed = future.result()
+        except Exception as e:
+            showInfo(f"Translate failed: {e}")
+            return
+
+        added = {}
+
+        def add_notes(col):
+            schemas = SchemaCache(col)
+            requests, missing_note_types, mismatched = [], set(), {}
+            for results in all_results:
+                batch_missing, batch_mismatched = schemas.check(results)
+                missing_note_types.update(batch_missing)
+                mismatched.update(batch_mismatched)
+                requests.extend(schemas.note_requests(results, deck_id))
+
+            added["count"] = len(requests)
+            added["problems"] = format_problems(missing_note_types, mismatched)
+
+            # A single call, so the whole import is one undo step
+            return col.add_notes(requests)
+
+        def on_added(changes):
+            problems.extend(
+                f"Translate failed for {url}: {e}" for url, e in failed.items()
+            )
+            problems.extend(added["problems"])
+
+            summary = [
+                f"Translated {len(all_results)} of {len(urls)} entries.",
+                f"Created {added['count']} notes.",
+            ]
+            showInfo("\n".join(summary + problems))
+
+        CollectionOp(parent=mw, op=add_notes).success(on_added).with_progress(
+            "Adding notes..."
+        ).run_in_background()
+
+    mw.taskman.with_progress(
+        lambda: translate_urls(urls), on_done, label="Translating Pealim entries..."
+    )
 
-        fields = fields_and_tags[:-1]
-        tags = fields_and_tags[-1]
 
-        note = mw.col.new_note(note_type)
+def prompt_and_create_notes_from_word_list():
+    dialog = WordListDialog(mw)
+    init_deck_dialog(dialog)
 
-        # print(f"note: {note.keys()} {note.fields}")
+    if dialog.exec() != QDialog.DialogCode.Accepted:
+        return
+    words = dialog.words_input.toPlainText().splitlines()
+    if not any(word.strip() for word in words):
+        return
 
-        for i, val in enumerate(fields):
-            note.fields[i] = "" if val is None else str(val)
+    deck_id = dialog.deck_combo.currentData()
 
-        if tags:
-            note.tags.extend(tags)
+    resolver = Resolver(resolver_cache_path, request_concurrency)
+
+    def on_resolved(future):
+        try:
+            resolution = future.result()
+        except Exception as e:
+            showInfo(f"Resolve failed: {e}")
+            return
+
+        urls = list(resolution.resolved.values())
+
+        skipped = list(resolution.ambiguous)
+        if resolution.ambiguous:
+            review = ReviewDialog(resolution.ambiguous, mw)
+            if review.exec() == QDialog.DialogCode.Accepted:
+                choices = review.choices()
+                for word, candidate in choices.items():
+                    resolver.choose(word, candidate)
+                    urls.append(candidate.url)
+                skipped = [word for word in skipped if word not in choices]
+
+        resolver.save()
+
+        problems = []
+        if skipped:
+            problems.append(f"Skipped ambiguous words: {', '.join(skipped)}")
+        if resolution.missing:
+            problems.append(f"No entries found: {', '.join(resolution.missing)}")
+        problems.extend(
+            f"Search failed for {word}: {e}" for word, e in resolution.failed.items()
+        )
 
-        note.note_type()["did"] = deck_id
+        # Distinct words can resolve to the same entry
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            showInfo("\n".join(["No entries resolved."] + problems))
+            return
 
-        mw.col.add_note(note, deck_id)
+        create_notes_from_urls(urls, deck_id, problems)
 
-    if missing_note_types:
-        showInfo(f"Missing note types: {', '.join(missing_note_types)}")
-    mw.reset()
+    mw.taskman.with_progress(
+        lambda: resolver.resolve(words), on_resolved, label="Resolving words..."
+    )
 
 
 action.triggered.connect(prompt_and_create_note)
+word_list_action.triggered.connect(prompt_and_create_notes_from_word_list)
 
 mw.form.menuTools.addAction(action)
+mw.form.menuTools.addAction(word_list_action)
@@ -0,0 +1,89 @@
+import argparse
+import gc
+import tracemalloc
+
+import convert
+from compact import CompactBatch
+
+
+binyanim = ["PA'AL", "PI'EL", "HIF'IL", "HITPA'EL", "NIF'AL", "PU'AL", "HUF'AL"]
+roots = [
+    "א - מ - ר",
+    "כ - ת - ב",
+    "ב - ו - א",
+    "ק - ר - ה",
+    "נ - פ - ל",
+    "ח - ש - ב",
+]
+
+
+def forms(i: int, count: int):
+    return [
+        value
+        for k in range(count)
+        for value in (f"כָּתַב{i}.{k}", f"כתב{i}.{k}", f"wrote {i}.{k}")
+    ]
+
+
+def verb_results(i: int) -> dict:
+    """Return results shaped like `convert_verb`'s, with fields unique to `i`."""
+    binyan = convert.extract_binyan(binyanim[i % len(binyanim)])
+    paal_tags = convert.convert_shoresh(roots[i % len(roots)])
+
+    return {
+        "Hebrew Basic and Reversed Type-in": convert.HebrewBasic(
+            *forms(i, 1), "", "", ["infinitive", binyan] + paal_tags
+        ),
+        "Hebrew Present Tense Conjugation": convert.HebrewPresentTenseConjugation(
+            *forms(i, 4), "", ["הוה", binyan] + paal_tags
+        ),
+        "Hebrew Past Tense Conjugation": convert.HebrewPastTenseConjugation(
+            *forms(i, 9), "", ["עבר", binyan] + paal_tags
+        ),
+        "Hebrew Future Tense Conjugation": convert.HebrewFutureTenseConjugation(
+            *forms(i, 10), "", ["עתיד", binyan] + paal_tags
+        ),
+        "Hebrew Imperative Conjugation": convert.HebrewImperativeConjugation(
+            *forms(i, 4), "", ["צווי", binyan] + paal_tags
+        ),
+    }
+
+
+def retained_memory(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    held = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare holding verb results as NamedTuples and in a CompactBatch."
+    )
+    parser.add_argument("--pages", type=int, default=10000)
+    args = parser.parse_args()
+
+    def build_list():
+        return [verb_results(i) for i in range(args.pages)]
+
+    def build_compact():
+        batch = CompactBatch()
+        for i in range(args.pages):
+            batch.append(verb_results(i))
+        return batch
+
+    plain = retained_memory(build_list)
+    compact = retained_memory(build_compact)
+    print(f"NamedTuple results: {plain / 1e6:.1f} MB for {args.pages} pages")
+    print(f"CompactBatch:       {compact / 1e6:.1f} MB ({compact / plain:.0%})")
+
+    batch = build_compact()
+    assert list(batch) == [verb_results(i) for i in range(args.pages)]
+    print("CompactBatch round-trips without loss.")
+
+
+if __name__ == "__main__":
+    main()
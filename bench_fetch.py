@@ -0,0 +1,74 @@
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fetch
+from bench_memory import canned_page
+from convert import translate_batch
+
+
+class CannedHandler(BaseHTTPRequestHandler):
+    # Simulated network and server latency, in seconds
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        body = canned_page(int(self.path.strip("/").rsplit("/", 1)[-1]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def time_batch(name: str, batch) -> float:
+    start = time.perf_counter()
+    count = 0
+    for result in batch:
+        assert result.error is None, result.error
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(f"{name:32s} {count} pages in {elapsed:.2f}s ({count / elapsed:.1f} pages/s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the threaded and asyncio fetch paths against a "
+        "local server."
+    )
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64])
+    args = parser.parse_args()
+
+    CannedHandler.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CannedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/dict"
+    urls = [f"{base_url}/{i}" for i in range(args.pages)]
+
+    transport = "httpx" if fetch.httpx is not None else "requests in threads"
+    print(f"asyncio transport: {transport}, latency {args.latency}s per page")
+
+    try:
+        for concurrency in args.concurrency:
+            time_batch(
+                f"translate_batch({concurrency})", translate_batch(urls, concurrency)
+            )
+            time_batch(
+                f"translate_many({concurrency})",
+                fetch.translate_many(urls, concurrency),
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
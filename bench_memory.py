@@ -0,0 +1,108 @@
+import argparse
+import gc
+import tracemalloc
+from unittest import mock
+
+import convert
+from convert import pealim_to_jinja, translate_batch
+
+
+# Real pages carry navigation, scripts and footers around the table
+page_padding = "<div class='nav'>" + "<a href='/'>pealim</a>" * 200 + "</div>"
+
+
+def canned_page(i: int) -> bytes:
+    """Return a verb page shaped like Pealim's, with words unique to `i`."""
+    forms = []
+    for peal in pealim_to_jinja:
+        meaning = f"is writing {i}" if peal.startswith("AP") else f"to write {i}"
+        forms.append(
+            f'<div id="{peal}"><span class="menukad">כָּתַב{i}</span>'
+            f'<div class="meaning"><strong>{meaning}</strong></div></div>'
+        )
+
+    return (
+        "<html><body>"
+        + page_padding
+        + '<p>Root: <span class="menukad">כ - ת - ב</span></p>'
+        + '<h2 class="page-header">Conjugation of כתב</h2><p>Verb – PA\'AL</p>'
+        + '<table class="conjugation-table"><tr><td>'
+        + "".join(forms)
+        + "</td></tr></table>"
+        + page_padding
+        + "</body></html>"
+    ).encode("utf-8")
+
+
+class CannedResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        self.content = None
+
+
+def canned_get(url, *args, **kwargs):
+    return CannedResponse(canned_page(int(url.rsplit("/", 1)[-1])))
+
+
+def run_batch(batch_size: int, max_in_flight: int):
+    urls = (f"https://www.pealim.com/dict/{i}" for i in range(batch_size))
+    with mock.patch.object(convert.requests, "get", canned_get):
+        for result in translate_batch(urls, max_in_flight=max_in_flight):
+            assert result.error is None, result.error
+
+
+def peak_memory(batch_size: int, max_in_flight: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    run_batch(batch_size, max_in_flight)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that translate_batch's peak memory doesn't grow "
+        "with the batch."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400])
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="allowed ratio to the smallest batch",
+    )
+    args = parser.parse_args()
+
+    # Fill the import, regex and parser caches before measuring
+    run_batch(args.max_in_flight, args.max_in_flight)
+
+    peaks = {}
+    for size in args.sizes:
+        peaks[size] = peak_memory(size, args.max_in_flight)
+        print(f"{size:6d} pages: peak {peaks[size] / 1e6:.1f} MB")
+
+    baseline = peaks[args.sizes[0]]
+    for size, peak in peaks.items():
+        assert peak <= baseline * args.tolerance, (
+            f"peak memory for {size} pages is {peak / baseline:.2f}x that of "
+            f"{args.sizes[0]} pages"
+        )
+    print("Peak memory is flat.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+field_separator = "\x1f"
+
+
+def pack_fields(values) -> Union[str, Tuple[str, ...]]:
+    # A single joined `str` (like Anki's `flds`) instead of one object per
+    # field, unless joining wouldn't split back to the same values
+    if all(type(v) is str and field_separator not in v for v in values):
+        return field_separator.join(values)
+    return tuple(values)
+
+
+def unpack_fields(fields: Union[str, Tuple[str, ...]]) -> Tuple[str, ...]:
+    if isinstance(fields, str):
+        return fields.split(field_separator)
+    return fields
+
+
+class CompactCard:
+    __slots__ = ("fields", "tags")
+
+    def __init__(self, fields: Union[str, Tuple[str, ...]], tags: Tuple[str, ...]):
+        self.fields = fields
+        self.tags = tags
+
+    def to_namedtuple(self, result_type: type):
+        return result_type(*unpack_fields(self.fields), list(self.tags))
+
+
+class CompactBatch:
+    """Hold many `convert_*` results with shared, interned tags.
+
+    Every card of a page carries its own tag list, repeating the same binyan
+    and root class strings across a batch; here each distinct tag list is
+    stored once as an interned tuple, and cards keep their fields packed into
+    one string in a `__slots__` row.  Iterating the batch gives back the
+    original results.
+    """
+
+    def __init__(self):
+        self._tag_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        # Each page holds a (note type name, result type, card) per result;
+        # both are `None` for cards the converter didn't produce
+        self.pages: List[tuple] = []
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __iter__(self) -> Iterator[dict]:
+        for page in self.pages:
+            yield self.expand(page)
+
+    def _tags(self, tags) -> Tuple[str, ...]:
+        key = tuple(sys.intern(tag) for tag in tags)
+        return self._tag_tuples.setdefault(key, key)
+
+    def compact(self, results: dict) -> tuple:
+        return tuple(
+            (sys.intern(note_type_name), None, None)
+            if card is None
+            else (
+                sys.intern(note_type_name),
+                type(card),
+                CompactCard(pack_fields(card[:-1]), self._tags(card[-1])),
+            )
+            for note_type_name, card in results.items()
+        )
+
+    def expand(self, page) -> dict:
+        return {
+            note_type_name: None
+            if card is None
+            else card.to_namedtuple(result_type)
+            for note_type_name, result_type, card in page
+        }
+
+    def append(self, results: dict):
+        self.pages.append(self.compact(results))
@@ -1,4 +1,10 @@
-from typing import List, NamedTuple
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import Iterable, Iterator, List, NamedTuple, Optional
 from bs4 import BeautifulSoup as bs
 import re
 import requests
@@ -629,11 +635,58 @@ def get_subheader(soup) -> str:
     return soup.find("h2", class_="page-header").next_sibling.text
 
 
+def parse_page(content: bytes):
+    # The converters only keep `.text` values, which are plain `str`s, so the
+    # tree can be released as soon as they return
+    soup = bs(content, features="html.parser")
+    try:
+        fun = extract_pos(soup)
+        return fun(soup)
+    finally:
+        soup.decompose()
+
+
 def translate(url) -> List[str]:
-    resp = requests.get(url)
-    soup = bs(resp.content, features="html.parser")
-    fun = extract_pos(soup)
-    return fun(soup)
+    with requests.get(url) as resp:
+        resp.raise_for_status()
+        content = resp.content
+    return parse_page(content)
+
+
+class BatchResult(NamedTuple):
+    url: str
+    results: Optional[dict]
+    error: Optional[Exception]
+
+
+def _translate_result(url) -> BatchResult:
+    try:
+        return BatchResult(url, translate(url), None)
+    except Exception as e:
+        return BatchResult(url, None, e)
+
+
+def translate_batch(
+    urls: Iterable[str], max_in_flight: int = 8
+) -> Iterator[BatchResult]:
+    """Translate `urls` concurrently, yielding results as they complete.
+
+    At most `max_in_flight` pages are fetched or held at once; new requests
+    are only submitted as the consumer takes finished results.
+    """
+    urls = iter(urls)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        pending = set()
+        for url in urls:
+            pending.add(executor.submit(_translate_result, url))
+            if len(pending) < max_in_flight:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+        for future in as_completed(pending):
+            yield future.result()
 
 
 # Verb
@@ -0,0 +1,459 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+if __package__:
+    from .convert import translate_batch
+else:
+    # Run as a script, outside of Anki
+    from convert import translate_batch
+
+
+schema_sql = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null,
+    usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null,
+    tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null,
+    flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null,
+    type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null,
+    factor integer not null, time integer not null, type integer not null
+);
+CREATE TABLE graves (
+    usn integer not null, oid integer not null, type integer not null
+);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+card_css = """.card {
+    font-family: arial;
+    font-size: 20px;
+    text-align: center;
+    color: black;
+    background-color: white;
+}
+"""
+
+default_dconf = {
+    "id": 1,
+    "name": "Default",
+    "mod": 0,
+    "usn": 0,
+    "maxTaken": 60,
+    "autoplay": True,
+    "timer": 0,
+    "replayq": True,
+    "dyn": False,
+    "new": {
+        "bury": True,
+        "delays": [1, 10],
+        "initialFactor": 2500,
+        "ints": [1, 4, 7],
+        "order": 1,
+        "perDay": 20,
+        "separate": True,
+    },
+    "rev": {
+        "bury": True,
+        "ease4": 1.3,
+        "fuzz": 0.05,
+        "ivlFct": 1,
+        "maxIvl": 36500,
+        "minSpace": 1,
+        "perDay": 200,
+    },
+    "lapse": {
+        "delays": [10],
+        "leechAction": 0,
+        "leechFails": 8,
+        "minInt": 1,
+        "mult": 0,
+    },
+}
+
+
+def stable_id(name: str) -> int:
+    # Stable across exports, so re-importing a deck updates the same note types
+    return int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def field_checksum(value: str) -> int:
+    return int(hashlib.sha1(value.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def make_deck(deck_id: int, name: str, mod: int) -> dict:
+    return {
+        "id": deck_id,
+        "name": name,
+        "mod": mod,
+        "usn": -1,
+        "lrnToday": [0, 0],
+        "revToday": [0, 0],
+        "newToday": [0, 0],
+        "timeToday": [0, 0],
+        "collapsed": False,
+        "browserCollapsed": False,
+        "desc": "",
+        "dyn": 0,
+        "conf": 1,
+        "extendNew": 10,
+        "extendRev": 50,
+    }
+
+
+def make_templates(fields: List[str]):
+    """Return the card templates and the field index each one requires.
+
+    Each `<Prefix>Hebrew`/`<Prefix>HebrewCheck`/`<Prefix>English` group gets a
+    type-in card, and groups with an `<Prefix>EnglishCheck` field also get a
+    reversed card.
+    """
+    templates = []
+    for field in fields:
+        if not field.endswith("HebrewCheck"):
+            continue
+        prefix = field[: -len("HebrewCheck")]
+        name = prefix or "Card"
+        hebrew, english = prefix + "Hebrew", prefix + "English"
+
+        templates.append(
+            (
+                {
+                    "name": f"{name} Type-in",
+                    "qfmt": f"{{{{#{hebrew}}}}}{{{{{english}}}}}<br>"
+                    f"{{{{type:{field}}}}}{{{{/{hebrew}}}}}",
+                    "afmt": f"{{{{FrontSide}}}}<hr id=answer>{{{{{hebrew}}}}}"
+                    "<br>{{Note}}",
+                },
+                fields.index(hebrew),
+            )
+        )
+
+        if prefix + "EnglishCheck" in fields:
+            templates.append(
+                (
+                    {
+                        "name": f"{name} Reversed",
+                        "qfmt": f"{{{{#{hebrew}}}}}{{{{{hebrew}}}}}{{{{/{hebrew}}}}}",
+                        "afmt": f"{{{{FrontSide}}}}<hr id=answer>{{{{{english}}}}}"
+                        "<br>{{Note}}",
+                    },
+                    fields.index(hebrew),
+                )
+            )
+
+    return templates
+
+
+def make_model(name: str, result_type: type, deck_id: int, mod: int):
+    fields = list(result_type._fields[:-1])
+    templates = make_templates(fields)
+
+    model = {
+        "id": stable_id(name),
+        "name": name,
+        "type": 0,
+        "mod": mod,
+        "usn": -1,
+        "sortf": 0,
+        "did": deck_id,
+        "tmpls": [
+            dict(template, ord=i, did=None, bqfmt="", bafmt="")
+            for i, (template, _) in enumerate(templates)
+        ],
+        "flds": [
+            {
+                "name": field,
+                "ord": i,
+                "sticky": False,
+                "rtl": "Hebrew" in field,
+                "font": "Arial",
+                "size": 20,
+                "media": [],
+            }
+            for i, field in enumerate(fields)
+        ],
+        "css": card_css,
+        "latexPre": "\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n"
+        "\\usepackage[utf8]{inputenc}\n\\usepackage{amssymb,amsmath}\n"
+        "\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n",
+        "latexPost": "\\end{document}",
+        "latexsvg": False,
+        "req": [
+            [i, "any", [field_index]] for i, (_, field_index) in enumerate(templates)
+        ],
+        "tags": [],
+        "vers": [],
+    }
+
+    return model, [field_index for _, field_index in templates]
+
+
+class ApkgWriter:
+    """Write `convert_*` results straight into an Anki package.
+
+    Notes and cards are buffered and written to SQLite in transactions of
+    `batch_size` notes, so results can be streamed in without keeping the
+    whole deck in memory.  The note type definitions are written when the
+    writer is closed.
+
+    Note GUIDs are derived from the note type and the entry's source URL, so
+    re-exporting an entry updates its notes on import, and an entry added
+    twice to the same package is only written once.
+    """
+
+    def __init__(self, path: str, deck_name: str = "Pealim", batch_size: int = 5000):
+        self.path = path
+        self.deck_name = deck_name
+        self.deck_id = stable_id(deck_name)
+        self.batch_size = batch_size
+
+        self.mod = int(time.time())
+        self._next_id = int(time.time() * 1000)
+        self.note_count = 0
+        self.card_count = 0
+        self.skipped_count = 0
+        self._guids: Set[str] = set()
+
+        self.models: Dict[str, dict] = {}
+        self._required: Dict[str, List[int]] = {}
+        self._notes: List[tuple] = []
+        self._cards: List[tuple] = []
+
+        self._tmp_dir = tempfile.mkdtemp()
+        self._db_path = os.path.join(self._tmp_dir, "collection.anki2")
+        self.db = sqlite3.connect(self._db_path)
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.executescript(schema_sql)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _model(self, note_type_name: str, result_type: type) -> dict:
+        if note_type_name not in self.models:
+            model, required = make_model(
+                note_type_name, result_type, self.deck_id, self.mod
+            )
+            self.models[note_type_name] = model
+            self._required[note_type_name] = required
+        return self.models[note_type_name]
+
+    def add_note(self, note_type_name: str, card, url: str):
+        guid = base64.urlsafe_b64encode(
+            hashlib.sha1(f"{note_type_name}\x1f{url}".encode("utf-8")).digest()[:8]
+        ).decode("ascii")
+        if guid in self._guids:
+            self.skipped_count += 1
+            return
+        self._guids.add(guid)
+
+        model = self._model(note_type_name, type(card))
+        fields = ["" if val is None else str(val) for val in card[:-1]]
+        tags = card[-1]
+
+        flds = "\x1f".join(fields)
+
+        note_id = self._new_id()
+        self._notes.append(
+            (
+                note_id,
+                guid,
+                model["id"],
+                self.mod,
+                -1,
+                f" {' '.join(tags)} " if tags else "",
+                flds,
+                fields[0],
+                field_checksum(fields[0]),
+                0,
+                "",
+            )
+        )
+
+        for ord_, field_index in enumerate(self._required[note_type_name]):
+            if not fields[field_index]:
+                continue
+            self._cards.append(
+                (
+                    self._new_id(),
+                    note_id,
+                    self.deck_id,
+                    ord_,
+                    self.mod,
+                    -1,
+                    0,
+                    0,
+                    self.note_count,
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    "",
+                )
+            )
+
+        self.note_count += 1
+        if len(self._notes) >= self.batch_size:
+            self.flush()
+
+    def add_results(self, url: str, results: dict):
+        for note_type_name, card in results.items():
+            if card is not None:
+                self.add_note(note_type_name, card, url)
+
+    def flush(self):
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)", self._notes
+            )
+            self.db.executemany(
+                "INSERT INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                self._cards,
+            )
+        self.card_count += len(self._cards)
+        self._notes.clear()
+        self._cards.clear()
+
+    def _write_col(self):
+        models = {str(model["id"]): model for model in self.models.values()}
+        decks = {
+            "1": make_deck(1, "Default", self.mod),
+            str(self.deck_id): make_deck(self.deck_id, self.deck_name, self.mod),
+        }
+        conf = {
+            "nextPos": self.note_count,
+            "estTimes": True,
+            "activeDecks": [self.deck_id],
+            "sortType": "noteFld",
+            "timeLim": 0,
+            "sortBackwards": False,
+            "addToCur": True,
+            "curDeck": self.deck_id,
+            "newBury": True,
+            "newSpread": 0,
+            "dueCounts": True,
+            "curModel": next(iter(models), None),
+            "collapseTime": 1200,
+        }
+        with self.db:
+            self.db.execute(
+                "INSERT INTO col VALUES (1,?,?,?,11,0,0,0,?,?,?,?,?)",
+                (
+                    self.mod,
+                    self.mod * 1000,
+                    self.mod * 1000,
+                    json.dumps(conf),
+                    json.dumps(models),
+                    json.dumps(decks),
+                    json.dumps({"1": default_dconf}),
+                    "{}",
+                ),
+            )
+
+    def close(self):
+        try:
+            self.flush()
+            self._write_col()
+            self.db.close()
+
+            with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as apkg:
+                apkg.write(self._db_path, "collection.anki2")
+                apkg.writestr("media", "{}")
+        finally:
+            self.abort()
+
+    def abort(self):
+        self.db.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+def export_apkg(
+    path: str,
+    results: Iterable[Tuple[str, Optional[dict]]],
+    deck_name: str = "Pealim",
+    batch_size: int = 5000,
+) -> ApkgWriter:
+    """Export `(url, results)` pairs, such as `BatchResult`s, to `path`."""
+    with ApkgWriter(path, deck_name, batch_size) as writer:
+        for url, result, *_ in results:
+            if result:
+                writer.add_results(url, result)
+    return writer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export Pealim entries to an Anki package."
+    )
+    parser.add_argument("urls", help="file with one Pealim URL per line")
+    parser.add_argument("output", help="path of the .apkg file to write")
+    parser.add_argument("--deck", default="Pealim", help="name of the deck")
+    args = parser.parse_args()
+
+    with open(args.urls, encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    def results():
+        for result in translate_batch(urls):
+            if result.error is not None:
+                print(
+                    f"Translate failed for {result.url}: {result.error}",
+                    file=sys.stderr,
+                )
+            yield result
+
+    writer = export_apkg(args.output, results(), args.deck)
+    print(f"Wrote {writer.note_count} notes and {writer.card_count} cards.")
+    if writer.skipped_count:
+        print(f"Skipped {writer.skipped_count} duplicate notes.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
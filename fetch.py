@@ -0,0 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, Iterator
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+if __package__:
+    from .convert import BatchResult, parse_page
+else:
+    # Imported by the benchmark scripts, outside of Anki
+    from convert import BatchResult, parse_page
+
+
+def _make_client(concurrency: int):
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    try:
+        return httpx.AsyncClient(http2=True, limits=limits, follow_redirects=True)
+    except ImportError:
+        # HTTP/2 support needs the optional `h2` package
+        return httpx.AsyncClient(limits=limits, follow_redirects=True)
+
+
+def _get(url) -> bytes:
+    with requests.get(url) as resp:
+        resp.raise_for_status()
+        return resp.content
+
+
+async def atranslate_many(
+    urls: Iterable[str], concurrency: int = 8, parse_workers: int = None
+) -> AsyncIterator[BatchResult]:
+    """Fetch and translate `urls` on an event loop, yielding results as they complete.
+
+    Pages are fetched with `httpx` (over HTTP/2 when `h2` is installed) and
+    fall back to `requests` in a thread pool otherwise. Parsing runs in a
+    separate executor, and at most `concurrency` pages are in flight at once.
+    The default is polite to pealim.com; raise it only for bulk or offline use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _make_client(concurrency) if httpx is not None else None
+    fetch_executor = (
+        ThreadPoolExecutor(max_workers=concurrency) if client is None else None
+    )
+    parse_executor = ThreadPoolExecutor(max_workers=parse_workers)
+
+    async def fetch(url) -> bytes:
+        if client is None:
+            return await loop.run_in_executor(fetch_executor, _get, url)
+        resp = await client.get(url)
+        resp.raise_for_status()
+        content = resp.content
+        await resp.aclose()
+        return content
+
+    async def translate(url) -> BatchResult:
+        try:
+            content = await fetch(url)
+            results = await loop.run_in_executor(parse_executor, parse_page, content)
+            return BatchResult(url, results, None)
+        except Exception as e:
+            return BatchResult(url, None, e)
+
+    pending = set()
+    try:
+        for url in urls:
+            pending.add(asyncio.ensure_future(translate(url)))
+            if len(pending) < concurrency:
+                continue
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+
+        for task in asyncio.as_completed(pending):
+            yield await task
+    finally:
+        for task in pending:
+            task.cancel()
+        if client is not None:
+            await client.aclose()
+        if fetch_executor is not None:
+            fetch_executor.shutdown(wait=False)
+        parse_executor.shutdown(wait=False)
+
+
+def translate_many(urls: Iterable[str], concurrency: int = 8) -> Iterator[BatchResult]:
+    """Drive `atranslate_many` on a private event loop, yielding each result."""
+    loop = asyncio.new_event_loop()
+    results = atranslate_many(urls, concurrency)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
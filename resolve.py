@@ -0,0 +1,130 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup as bs
+import requests
+
+
+search_url = "https://www.pealim.com/search/"
+
+dict_href = re.compile(r"^(https://www\.pealim\.com)?/dict/\d+-[^/]+/?$")
+
+
+class Candidate(NamedTuple):
+    url: str
+    label: str
+
+
+class Resolution(NamedTuple):
+    resolved: Dict[str, str]
+    ambiguous: Dict[str, List[Candidate]]
+    missing: List[str]
+    failed: Dict[str, str]
+
+
+def normalize_word(word: str) -> str:
+    return " ".join(word.split()).lower()
+
+
+def search(word: str) -> List[Candidate]:
+    resp = requests.get(search_url, params={"q": word})
+    resp.raise_for_status()
+
+    # Pealim redirects straight to the entry when there is a single match
+    if "/dict/" in resp.url:
+        return [Candidate(resp.url, word)]
+
+    soup = bs(resp.content, features="html.parser")
+    resp.close()
+
+    candidates = []
+    seen = set()
+    for a in soup.find_all("a", href=dict_href):
+        url = urljoin(resp.url, a["href"])
+        if url in seen:
+            continue
+        seen.add(url)
+        row = a.find_parent("tr")
+        label = " ".join((row or a).get_text(" ").split())
+        candidates.append(Candidate(url, label))
+
+    soup.decompose()
+
+    return candidates
+
+
+class Resolver:
+    """Map plain Hebrew or English words to Pealim dictionary entries.
+
+    Search results with one or several matches are cached per word, and the
+    cache is persisted to `cache_path` so that repeated lists resolve without
+    network calls.  Words with no matches are searched again next time, since
+    an empty result page can also come from rate limiting or a site change.
+    """
+
+    def __init__(self, cache_path: str = None, max_workers: int = 8):
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self.cache: Dict[str, List[Candidate]] = {}
+
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                self.cache = {
+                    word: [Candidate(*c) for c in candidates]
+                    for word, candidates in json.load(f).items()
+                    if candidates
+                }
+
+    def save(self):
+        if not self.cache_path:
+            return
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def choose(self, word: str, candidate: Candidate):
+        """Record the reviewed entry for an ambiguous word."""
+        self.cache[normalize_word(word)] = [candidate]
+
+    def resolve(self, words: Iterable[str]) -> Resolution:
+        keys = {}
+        for word in words:
+            key = normalize_word(word)
+            if key:
+                keys.setdefault(key, word.strip())
+
+        failed = {}
+        found = {key: self.cache[key] for key in keys if key in self.cache}
+        pending = [key for key in keys if key not in found]
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [(key, executor.submit(search, key)) for key in pending]
+                for key, future in futures:
+                    try:
+                        found[key] = future.result()
+                    except Exception as e:
+                        failed[keys[key]] = str(e)
+                        continue
+                    if found[key]:
+                        self.cache[key] = found[key]
+
+        resolved, ambiguous, missing = {}, {}, []
+        for key, word in keys.items():
+            if word in failed:
+                continue
+            candidates = found[key]
+            if len(candidates) == 1:
+                resolved[word] = candidates[0].url
+            elif candidates:
+                ambiguous[word] = candidates
+            else:
+                missing.append(word)
+
+        return Resolution(resolved, ambiguous, missing, failed)
@@ -0,0 +1,96 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from anki.collection import AddNoteRequest
+from anki.notes import Note
+
+
+class NoteSchema(NamedTuple):
+    note_type: dict
+    # Model field index for each result field, in result order (tags excluded)
+    field_indices: Tuple[int, ...]
+    missing_fields: Tuple[str, ...]
+
+
+class SchemaCache:
+    """Resolve note types and their field layout once per session or batch.
+
+    Result fields are matched to note type fields by name, so note types
+    whose fields are in a different order are filled correctly, and note
+    types lacking some of the fields are reported instead of being filled
+    by position.
+    """
+
+    def __init__(self, col):
+        self.col = col
+        self._schemas: Dict[Tuple[str, type], Optional[NoteSchema]] = {}
+
+    def get(self, note_type_name: str, result_type: type) -> Optional[NoteSchema]:
+        key = (note_type_name, result_type)
+        if key not in self._schemas:
+            self._schemas[key] = self._compile(note_type_name, result_type)
+        return self._schemas[key]
+
+    def _compile(self, note_type_name, result_type) -> Optional[NoteSchema]:
+        note_type = self.col.models.by_name(note_type_name)
+        if note_type is None:
+            return None
+
+        field_map = self.col.models.field_map(note_type)
+
+        field_indices, missing_fields = [], []
+        for field_name in result_type._fields[:-1]:
+            if field_name in field_map:
+                field_indices.append(field_map[field_name][0])
+            else:
+                missing_fields.append(field_name)
+
+        return NoteSchema(note_type, tuple(field_indices), tuple(missing_fields))
+
+    def check(self, results: dict) -> Tuple[List[str], Dict[str, Tuple[str, ...]]]:
+        """Return the missing note types and the note types with missing fields."""
+        missing_note_types, mismatched = [], {}
+        for note_type_name, card in results.items():
+            if card is None:
+                continue
+            schema = self.get(note_type_name, type(card))
+            if schema is None:
+                missing_note_types.append(note_type_name)
+            elif schema.missing_fields:
+                mismatched[note_type_name] = schema.missing_fields
+        return missing_note_types, mismatched
+
+    def new_note(self, note_type_name: str, card) -> Optional[Note]:
+        schema = self.get(note_type_name, type(card))
+        if schema is None or schema.missing_fields:
+            return None
+
+        note = self.col.new_note(schema.note_type)
+
+        for i, val in zip(schema.field_indices, card[:-1]):
+            note.fields[i] = "" if val is None else str(val)
+
+        tags = card[-1]
+        if tags:
+            note.tags.extend(tags)
+
+        return note
+
+    def add_note(self, note_type_name: str, card, deck_id: int) -> bool:
+        note = self.new_note(note_type_name, card)
+        if note is None:
+            return False
+
+        self.col.add_note(note, deck_id)
+
+        return True
+
+    def note_requests(self, results: dict, deck_id: int) -> List[AddNoteRequest]:
+        """Build the notes for `results`, to be added in one `col.add_notes` call."""
+        requests = []
+        for note_type_name, card in results.items():
+            if card is None:
+                continue
+            note = self.new_note(note_type_name, card)
+            if note is not None:
+                requests.append(AddNoteRequest(note=note, deck_id=deck_id))
+        return requests